@@ -0,0 +1,21 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def mock_fitz(monkeypatch):
+    # Stands in for fitz.open: set return_value to the fake document, assert on the calls.
+    fitz_open = MagicMock()
+    monkeypatch.setattr("main.fitz.open", fitz_open)
+    return fitz_open
+
+
+@pytest.fixture
+def mysql_connect(monkeypatch):
+    # Patches mysql.connector.connect; every connection it hands out is conn, every cursor cur.
+    connect = MagicMock()
+    conn = connect.return_value
+    cur = conn.cursor.return_value
+    monkeypatch.setattr("main.mysql.connector.connect", connect)
+    return connect, conn, cur
@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
 import os
-import pdfplumber
 import docx
 import pptx
 import mysql.connector
@@ -8,14 +7,329 @@ import csv
 from PIL import Image
 from io import BytesIO
 import json
+import struct
+from functools import cached_property, lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
 from docx import Document
 from docx.opc.constants import RELATIONSHIP_TYPE
-from docx.oxml.ns import qn
-from docx.document import Document as DocxDocument
 import fitz  # PyMuPDF for PDF and font extraction
+from lxml import etree
+
+# PDFs with at least this many pages have their text extracted in worker processes
+PDF_PARALLEL_MIN_PAGES = 8
+PDF_PAGES_PER_TASK = 4
+# MuPDF text layout stops scaling past a few processes, so the page pool is capped
+PDF_MAX_WORKERS = 4
+# "dict" output without image blocks, which otherwise carry the raw image bytes for every page
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+# Same for "blocks" output, used when font metadata is not wanted
+PDF_BLOCK_FLAGS = fitz.TEXTFLAGS_BLOCKS & ~fitz.TEXT_PRESERVE_IMAGES
+# WordprocessingML queries for DOCX text, compiled once and run against the already-parsed
+# document tree so no python-docx Paragraph/Run/Font wrappers are built per run
+W_NAMESPACES = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+# Relationship ids of every w:hyperlink, returned as plain strings rather than elements
+_XP_DOCX_HYPERLINK_RIDS = etree.XPath(
+    ".//w:hyperlink/@r:id",
+    namespaces={**W_NAMESPACES, "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships"},
+    smart_strings=False,
+)
+_XP_DOCX_TABLES = etree.XPath("w:body/w:tbl", namespaces=W_NAMESPACES)
+_XP_DOCX_TABLE = (
+    etree.XPath("w:tr", namespaces=W_NAMESPACES),
+    etree.XPath("w:tc", namespaces=W_NAMESPACES),
+    etree.XPath("w:p", namespaces=W_NAMESPACES),
+    # The paragraph's own run content, like python-docx's CT_P.text: runs nested in text boxes or
+    # tracked changes are not part of the cell's text
+    etree.XPath(
+        "(w:r | w:hyperlink/w:r)/*[self::w:t or self::w:tab or self::w:br or self::w:cr"
+        " or self::w:ptab or self::w:noBreakHyphen]",
+        namespaces=W_NAMESPACES,
+    ),
+    etree.XPath("string(w:tcPr/w:gridSpan/@w:val)", namespaces=W_NAMESPACES),
+    etree.XPath("boolean(w:tcPr/w:vMerge[not(@w:val) or @w:val='continue'])", namespaces=W_NAMESPACES),
+)
+_XP_DOCX_RUNS = etree.XPath("w:body/w:p/w:r", namespaces=W_NAMESPACES)
+# Run content python-docx's Run.text reads, in document order: the w:t text plus the elements
+# it renders as characters, translated by _docx_text
+_XP_RUN_TEXT = etree.XPath("w:t | w:tab | w:br | w:cr | w:ptab | w:noBreakHyphen", namespaces=W_NAMESPACES)
+_XP_RUN_FONT = etree.XPath("string(w:rPr/w:rFonts/@w:ascii)", namespaces=W_NAMESPACES)
+_XP_RUN_SIZE = etree.XPath("w:rPr/w:sz/@w:val", namespaces=W_NAMESPACES)  # half-points
+_XP_RUN_BOLD = etree.XPath(
+    "boolean(w:rPr/w:b[not(@w:val) or not(@w:val='0' or @w:val='false' or @w:val='off')])",
+    namespaces=W_NAMESPACES,
+)
+_XP_RUN_ITALIC = etree.XPath(
+    "boolean(w:rPr/w:i[not(@w:val) or not(@w:val='0' or @w:val='false' or @w:val='off')])",
+    namespaces=W_NAMESPACES,
+)
+
+_W = "{%s}" % W_NAMESPACES["w"]
+_W_T, _W_BR, _W_TYPE = _W + "t", _W + "br", _W + "type"
+# Characters python-docx gives the other run content elements; a w:br is "\n" for a
+# text-wrapping break (the default type) and "" for page and column breaks
+_W_RUN_CHARS = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+# PresentationML/DrawingML queries for PPTX text: every run of every top-level shape on a slide
+# in one compiled query (group members are skipped, as in the links, images and tables passes). Each a:r then holds one a:t and at most one a:rPr
+# whose formatting is plain attributes, so those are read with find()/get() instead of XPath.
+P_NAMESPACES = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+}
+_XP_PPTX_RUNS = etree.XPath("p:cSld/p:spTree/p:sp/p:txBody/a:p/a:r", namespaces=P_NAMESPACES)
+_A_T = "{%s}t" % P_NAMESPACES["a"]
+_A_RPR = "{%s}rPr" % P_NAMESPACES["a"]
+_A_LATIN = "{%s}latin" % P_NAMESPACES["a"]
+# xsd:boolean spellings of true for the a:rPr b/i attributes
+XSD_TRUE = ("1", "true")
+
+_A_BR = "{%s}br" % P_NAMESPACES["a"]
+
+# DrawingML table queries for PPTX, same row/cell/paragraph/text layout as _XP_DOCX_TABLE;
+# merged cells are kept as their own a:tc elements so no span/merge queries are needed
+A_NAMESPACES = {"a": "http://schemas.openxmlformats.org/drawingml/2006/main"}
+_XP_PPTX_TABLE = (
+    etree.XPath("a:tr", namespaces=A_NAMESPACES),
+    etree.XPath("a:tc", namespaces=A_NAMESPACES),
+    etree.XPath("a:txBody/a:p", namespaces=A_NAMESPACES),
+    etree.XPath("a:r/a:t | a:fld/a:t | a:br", namespaces=A_NAMESPACES),
+    None,
+    None,
+)
+
+# Bold runs, or runs larger than this (in points), are classified as headings
+HEADING_MIN_FONT_SIZE = 12
+# Rows sent to MySQL per multi-row INSERT statement
+SQL_BATCH_SIZE = 1000
+# Substrings of PDF font names that mark a bold weight
+BOLD_FONT_MARKERS = ("Bold", "bold", "Black", "Heavy")
+
+SQL_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS extracted_data (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        file_name VARCHAR(255),
+        file_size BIGINT,
+        creation_time DATETIME,
+        modification_time DATETIME,
+        page_number INT,
+        data_type VARCHAR(50),
+        content TEXT,
+        font_name VARCHAR(100),
+        font_size VARCHAR(50),
+        bold BOOLEAN,
+        italic BOOLEAN
+    )
+"""
+SQL_INSERT = """
+    INSERT INTO extracted_data (
+        file_name, file_size, creation_time, modification_time,
+        page_number, data_type, content, font_name, font_size, bold, italic
+    )
+    VALUES """
+SQL_INSERT_ROW = "(%s, %s, FROM_UNIXTIME(%s), FROM_UNIXTIME(%s), %s, %s, %s, %s, %s, %s, %s)"
+
+
+# Multi-row INSERT for a batch of row_count rows, built once per length. The prepared cursor
+# only re-prepares when handed a different statement object, so reuse has to return the same str.
+@lru_cache(maxsize=16)
+def _sql_insert(row_count):
+    return SQL_INSERT + ", ".join(repeat(SQL_INSERT_ROW, row_count))
+
+
+# Documents reuse a handful of fonts, so each distinct name is only scanned once
+@lru_cache(maxsize=256)
+def _is_bold_font(font_name):
+    return any(marker in font_name for marker in BOLD_FONT_MARKERS)
+
+
+# Text of the run content elements selected by _XP_RUN_TEXT, as python-docx's Run.text builds it
+def _docx_text(elements):
+    parts = []
+    for el in elements:
+        tag = el.tag
+        if tag == _W_T:
+            parts.append(el.text or "")
+        elif tag == _W_BR:
+            parts.append("\n" if el.get(_W_TYPE, "textWrapping") == "textWrapping" else "")
+        else:
+            parts.append(_W_RUN_CHARS[tag])
+    return "".join(parts)
+
+
+# Paragraph text from its a:t and a:br elements, as python-pptx's _Paragraph.text builds it:
+# a line break inside a paragraph reads as a vertical tab
+def _pptx_text(elements):
+    return "".join("\v" if el.tag == _A_BR else el.text or "" for el in elements)
+
+
+def _extract_pdf_page(page, page_num):
+    blocks = page.get_text("dict", flags=PDF_TEXT_FLAGS)["blocks"]
+    # One comprehension per page rather than an append per span; only text blocks reach here
+    # thanks to the flags. Italic stays False since fitz does not provide italic info directly.
+    # The heading test is inlined, saving a Python call per span, and the size threshold and
+    # font check are bound to locals so no span pays a global lookup.
+    min_size, is_bold_font = HEADING_MIN_FONT_SIZE, _is_bold_font
+    return [
+        (page_num, text, "heading" if bold or font_size > min_size else "text", font_name, font_size, bold, False)
+        for block in blocks
+        for line in block["lines"]
+        for span in line["spans"]
+        if (text := span.get('text', '').strip())
+        for font_name, font_size in [(span.get("font", "Default"), span.get("size", 0))]
+        for bold in [is_bold_font(font_name)]
+    ]
+
+
+# Text-only variant for extractors built with include_fonts=False: MuPDF hands back one
+# (x0, y0, x1, y1, text, block_no, block_type) tuple per block and no span dicts at all, so
+# rows are per block and carry the same defaults as a span without font information
+def _extract_pdf_page_blocks(page, page_num):
+    return [
+        (page_num, text, "text", "Default", 0, False, False)
+        for x0, y0, x1, y1, block_text, block_no, block_type in page.get_text("blocks", flags=PDF_BLOCK_FLAGS)
+        if block_type == 0 and (text := block_text.strip())
+    ]
+
+
+# fitz objects can't be pickled, so each page-pool process opens its own document. The
+# initializer does that once per process from the PDF bytes the parent already read, and every
+# page range the process is handed afterwards reuses it.
+_worker_pdf = None
+
+def _init_pdf_worker(pdf_bytes):
+    global _worker_pdf
+    _worker_pdf = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+# Worker entry point
+def _extract_pdf_pages(page_indices, extract_page=_extract_pdf_page):
+    results = []
+    for i in page_indices:
+        results.extend(extract_page(_worker_pdf[i], i + 1))
+    return results
+
+# One sweep over a w:tbl / a:tbl element returning (rows, cols, cell texts). Cells are read
+# straight from the XML with paragraphs joined by newlines, like python-docx/python-pptx's
+# cell.text, but without building their cell wrappers; text_of turns each paragraph's selected
+# text and break elements into its text the way those libraries do. For DOCX, horizontally merged cells
+# are repeated across their grid span and vertical merge continuations take the text above,
+# matching python-docx's row.cells grid (PPTX keeps placeholder a:tc elements for merges).
+def _extract_xml_table(tbl, xpaths, text_of):
+    xp_rows, xp_cells, xp_paragraphs, xp_text, xp_span, xp_continues = xpaths
+    table = []
+    for tr in xp_rows(tbl):
+        row = []
+        for tc in xp_cells(tr):
+            if xp_continues is not None and xp_continues(tc) and table and len(row) < len(table[-1]):
+                text = table[-1][len(row)]
+            else:
+                text = "\n".join(text_of(xp_text(p)) for p in xp_paragraphs(tc)).strip()
+            span = int(xp_span(tc) or 1) if xp_span is not None else 1
+            row.extend([text] * span)
+        table.append(row)
+    return len(table), len(table[0]) if table else 0, table
+
+
+# Every JPEG start-of-frame marker (baseline, extended, progressive, lossless, arithmetic);
+# C4, C8 and CC in that range are DHT, JPG and DAC segments instead
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Width/height straight from the PNG IHDR, GIF screen descriptor or JPEG SOFn header,
+# falling back to PIL (header-only open) for anything else
+def _image_size(blob):
+    if blob[:8] == b"\x89PNG\r\n\x1a\n":
+        return struct.unpack(">II", blob[16:24])
+    if blob[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", blob[6:10])
+    if blob[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 <= len(blob) and blob[pos] == 0xFF:
+            marker = blob[pos + 1]
+            if marker in JPEG_SOF_MARKERS:
+                height, width = struct.unpack(">HH", blob[pos + 5:pos + 9])
+                return width, height
+            if marker == 0xFF:  # fill byte before the real marker
+                pos += 1
+                continue
+            pos += 2 + struct.unpack(">H", blob[pos + 2:pos + 4])[0]
+    with Image.open(BytesIO(blob)) as img:
+        return img.size
+
+
+# Container format from the leading magic bytes, falling back to PIL's header-only identify
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"\xff\xd8", "JPEG"),
+    (b"GIF8", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+)
+
+def _image_format(blob):
+    for signature, img_format in IMAGE_SIGNATURES:
+        if blob.startswith(signature):
+            return img_format
+    with Image.open(BytesIO(blob)) as img:
+        return img.format
+
+
+# PDF image filters whose stream extract_image hands back as stored; MuPDF converts every
+# other image (Flate, LZW, CCITT, JBIG2, ...) to PNG
+PDF_IMAGE_FORMATS = {"DCTDecode": "JPEG", "JPXDecode": "JPX"}
+
+# Where deferred PDF image bytes are read from: the extractor's document while it is open, then
+# a copy the loader opens again, so images outlive the extractor that found them. The reopened
+# copy is released along with the last image holding this source.
+class _PDFImageSource:
+    def __init__(self, loader, doc):
+        self.loader = loader
+        self.doc = doc
+
+    def image_bytes(self, xref):
+        if self.doc.is_closed:
+            self.doc = self.loader.load_file()
+        return self.doc.extract_image(xref)["image"]
+
+
+# Holds the encoded image bytes; PIL only decodes them when the pixels are actually needed,
+# and saving writes the original bytes as-is instead of decoding and re-encoding them. With
+# load, the bytes themselves are only fetched on first use, so size and format must be given.
+class LazyImage:
+    def __init__(self, blob=None, size=None, img_format=None, load=None):
+        self._blob = blob
+        self._load = load
+        self.size = size if size is not None else _image_size(blob)
+        self.format = img_format or _image_format(blob)
+
+    @property
+    def blob(self):
+        return self._blob if self._blob is not None else self.fetch()
+
+    # Pulls deferred bytes in now, e.g. while the document they come from is still open
+    def fetch(self):
+        if self._blob is None:
+            self._blob, self._load = self._load(), None
+        return self._blob
+
+    # Pickled (e.g. back from an extract_many worker) with its bytes, never with the loader
+    def __getstate__(self):
+        return {**self.__dict__, "_blob": self.blob, "_load": None}
+
+    def open(self):
+        return Image.open(BytesIO(self.blob))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.blob)
+
 
 # Abstract Class: FileLoader
 class FileLoader(ABC):
+    # Raw file bytes, set by load_file for loaders that read the file themselves (PDFLoader).
+    # None otherwise, e.g. for a loader that opens the document some other way.
+    data = None
+
     def __init__(self, file_path):
         self.file_path = file_path
         self.validate_file()
@@ -34,8 +348,12 @@ class PDFLoader(FileLoader):
         if not self.file_path.endswith('.pdf'):
             raise ValueError("Invalid file type. Expected a PDF file.")
     
+    # The file is read from disk once; the fitz document and any page workers are all opened
+    # from these bytes rather than each going back to the file
     def load_file(self):
-        return pdfplumber.open(self.file_path)
+        with open(self.file_path, "rb") as f:
+            self.data = f.read()
+        return fitz.open(stream=self.data, filetype="pdf")
 
 # Concrete Class: DOCXLoader
 class DOCXLoader(FileLoader):
@@ -56,14 +374,63 @@ class PPTLoader(FileLoader):
         return pptx.Presentation(self.file_path)
 
 
+LOADERS = {".pdf": PDFLoader, ".docx": DOCXLoader, ".pptx": PPTLoader}
+
+
+def get_loader(file_path):
+    loader_cls = LOADERS.get(os.path.splitext(file_path)[1].lower())
+    if loader_cls is None:
+        raise ValueError("Unsupported file type. Expected a PDF, DOCX or PPTX file.")
+    return loader_cls(file_path)
+
+
+# Worker entry point for DataExtractor.extract_many: everything is materialised into lists so
+# the result can be pickled back to the parent (images travel as encoded LazyImage bytes,
+# fetched while the document is still open)
+def _extract_one(file_path):
+    with DataExtractor(get_loader(file_path)) as extractor:
+        images = list(extractor.extract_images())
+        for *_, img in images:
+            img.fetch()
+        return {
+            "file_name": extractor.file_name,
+            "metadata": extractor.metadata,
+            "text": list(extractor.extract_text()),
+            "links": list(extractor.extract_links()),
+            "images": images,
+            "tables": list(extractor.extract_tables()),
+        }
+
+
 
 class DataExtractor:
-    def __init__(self, loader):
-        self.loader = loader.load_file()
+    FORMATS = {".pdf": "pdf", ".docx": "docx", ".pptx": "pptx"}
+
+    # include_fonts=False trades PDF font metadata for MuPDF's much cheaper plain-text output;
+    # DOCX and PPTX read fonts straight from the run XML, so it does not affect them
+    def __init__(self, loader, include_fonts=True):
+        self.file_loader = loader
+        self.include_fonts = include_fonts
         self.file_path = loader.file_path
         self.file_name = os.path.basename(self.file_path)
         self.metadata = self.get_metadata()
 
+        # The format never changes after construction, so the matching handler table is picked
+        # once instead of re-checking the extension per call
+        self.file_format = self.FORMATS.get(os.path.splitext(self.file_path)[1].lower())
+        if self.file_format is None:
+            raise ValueError("Unsupported file type. Expected a PDF, DOCX or PPTX file.")
+        self._extractors = self.HANDLERS[self.file_format]
+        self._cache = {}
+
+    # Files are independent, so whole-file extraction fans out across processes; results are
+    # yielded in input order. On spinning disks keep workers low, reads there are seek-bound.
+    @classmethod
+    def extract_many(cls, file_paths, workers=None):
+        workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(_extract_one, file_paths)
+
     def get_metadata(self):
         file_stats = os.stat(self.file_path)
         return {
@@ -72,155 +439,210 @@ class DataExtractor:
             "modification_time": file_stats.st_mtime
         }
 
+    # Each kind is parsed once and kept, so FileStorage and SQLStorage on the same extractor share
+    # one pass over the document. Images are cached as LazyImage, i.e. encoded bytes, not PIL objects.
+    def _cached(self, kind):
+        rows = self._cache.get(kind)
+        if rows is not None:
+            return iter(rows)
+        return self._record(kind)
+
+    # The first pass still streams rows to its caller while recording them; the cache is only
+    # stored once that pass runs to the end, so an abandoned iterator never leaves a partial result
+    def _record(self, kind):
+        rows = []
+        for row in self._extractors[kind](self):
+            rows.append(row)
+            yield row
+        self._cache[kind] = tuple(rows)
+
     def extract_text(self):
-        results = []
-
-        def is_heading(font_size, bold):
-            try:
-                fs = float(font_size)
-            except (ValueError, TypeError):
-                fs = 0
-            return bold or fs > 12  # adjust threshold as needed
-
-        # PDF Extraction using fitz
-        if self.file_path.endswith('.pdf'):
-            doc = fitz.open(self.file_path)
-            for i, page in enumerate(doc):
-                blocks = page.get_text("dict")["blocks"]
-                for block in blocks:
-                    if block["type"] == 0:  # text block
-                        for line in block["lines"]:
-                            for span in line["spans"]:
-                                text = span.get('text', '').strip()
-                                if not text:
-                                    continue
-                                font_name = span.get("font", "Default")
-                                font_size = span.get("size", 0)
-                                bold = "Bold" in font_name
-                                italic = False  # fitz does not provide italic info directly
-                                data_type = "heading" if is_heading(font_size, bold) else "text"
-                                results.append((i + 1, text, data_type, font_name, font_size, bold, italic))
-            return results
-
-        # DOCX Extraction using python-docx
-        elif self.file_path.endswith('.docx'):
-            doc = self.loader  # already loaded as a Document
-            for para in doc.paragraphs:
-                for run in para.runs:
-                    text = run.text.strip()
-                    if not text:
-                        continue
-                    font_name = run.font.name if run.font.name else "Default"
-                    font_size = run.font.size.pt if run.font.size else 0
-                    bold = run.bold if run.bold is not None else False
-                    italic = run.italic if run.italic is not None else False
-                    data_type = "heading" if is_heading(font_size, bold) else "text"
-                    results.append((1, text, data_type, font_name, font_size, bold, italic))
-            return results
-
-        # PPTX Extraction using python-pptx
-        elif self.file_path.endswith('.pptx'):
-            pres = self.loader  # already loaded as a Presentation
-            for i, slide in enumerate(pres.slides):
-                for shape in slide.shapes:
-                    if hasattr(shape, "text_frame") and shape.text_frame:
-                        for para in shape.text_frame.paragraphs:
-                            for run in para.runs:
-                                text = run.text.strip()
-                                if not text:
-                                    continue
-                                font = run.font
-                                font_name = font.name if font.name else "Default"
-                                font_size = font.size.pt if font.size else 0
-                                bold = font.bold if font.bold is not None else False
-                                italic = font.italic if font.italic is not None else False
-                                data_type = "heading" if is_heading(font_size, bold) else "text"
-                                results.append((i + 1, text, data_type, font_name, font_size, bold, italic))
-            return results
-
-        return results
+        return self._cached("text")
+
     def extract_links(self):
-            links = []
-            
-            if isinstance(self.loader, pdfplumber.PDF):
-                for i, page in enumerate(self.loader.pages):
-                    if hasattr(page, 'annots') and page.annots:
-                        for annot in page.annots:
-                            uri = annot.get("uri")
-                            if uri:
-                                links.append((i + 1, uri))
-            
-            elif isinstance(self.loader, DocxDocument):
-                for para in self.loader.paragraphs:
-                    for rel in self.loader.part.rels.values():
-                        if "hyperlink" in rel.reltype:
-                            if para.text and rel.target_ref in para.text:
-                                links.append((1, rel.target_ref))
-            
-            elif hasattr(self.loader, "slides"):  # Check if it's a Presentation object
-                for slide_num, slide in enumerate(self.loader.slides):
-                    for shape in slide.shapes:
-                        if shape.has_text_frame:
-                            for paragraph in shape.text_frame.paragraphs:
-                                for run in paragraph.runs:
-                                    if run.hyperlink and run.hyperlink.address:
-                                        links.append((slide_num + 1, run.hyperlink.address))
-            
-            return links
+        return self._cached("links")
 
     def extract_images(self):
-        images = []
-        
-        if self.file_path.endswith(".pdf"):
-            doc = fitz.open(self.file_path)
-            for page_num in range(len(doc)):
-                for img_index, img in enumerate(doc[page_num].get_images(full=True)):
-                    xref = img[0]
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    img_obj = Image.open(BytesIO(image_bytes))
-                    images.append((page_num + 1, "PNG", img_obj.size, img_obj))
-        
-        elif self.file_path.endswith(".docx"):
-            for i, rel in enumerate(self.loader.part.rels):
-                if "image" in self.loader.part.rels[rel].target_ref:
-                    image_data = self.loader.part.rels[rel].target_part.blob
-                    img_obj = Image.open(BytesIO(image_data))
-                    images.append((i + 1, "PNG", img_obj.size, img_obj))
-        
-        elif self.file_path.endswith(".pptx"):
-            for slide_num, slide in enumerate(self.loader.slides):
-                for shape in slide.shapes:
-                    if shape.shape_type == 13:  # Picture shape type
-                        image = shape.image
-                        img_obj = Image.open(BytesIO(image.blob))
-                        images.append((slide_num + 1, "PNG", img_obj.size, img_obj))
-        
-        return images
+        return self._cached("images")
 
     def extract_tables(self):
-        tables = []
-        if isinstance(self.loader, pdfplumber.PDF):
-            for i, page in enumerate(self.loader.pages):
-                extracted_tables = page.extract_tables()
-                for table in extracted_tables:
-                    tables.append((i + 1, len(table), len(table[0]) if table else 0, table))
-        
-        elif isinstance(self.loader, DocxDocument):
-            for i, table in enumerate(self.loader.tables):
-                extracted_table = [[cell.text.strip() for cell in row.cells] for row in table.rows]
-                tables.append((i + 1, len(extracted_table), len(extracted_table[0]) if extracted_table else 0, extracted_table))
-        
-        elif hasattr(self.loader, "slides"):  # Check if it's a Presentation object
-            for slide_num, slide in enumerate(self.loader.slides):
-                for shape in slide.shapes:
-                    if shape.has_table:
-                        table = shape.table
-                        extracted_table = [[cell.text.strip() for cell in row.cells] for row in table.rows]
-                        tables.append((slide_num + 1, len(extracted_table), len(extracted_table[0]) if extracted_table else 0, extracted_table))
-        
-        return tables
-    
+        return self._cached("tables")
+
+    # Parsed document, loaded on first use rather than in __init__
+    @cached_property
+    def loader(self):
+        return self.file_loader.load_file()
+
+    # Releases the loaded document when it holds a file open (the fitz document and its mmapped buffers for PDFs)
+    def close(self):
+        loader = self.__dict__.pop("loader", None)
+        if hasattr(loader, "close"):
+            loader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    # DOCX relationships split by kind once, instead of re-walking part.rels on every call
+    @cached_property
+    def _hyperlink_rels(self):
+        return {rid: rel.target_ref for rid, rel in self.loader.part.rels.items() if "hyperlink" in rel.reltype}
+
+    @cached_property
+    def _image_rels(self):
+        return [(i, rel) for i, rel in enumerate(self.loader.part.rels.values()) if "image" in rel.target_ref]
+
+    # Every _extract_* implementation is a generator; _cached drains each one at most once
+
+    # Text extraction
+    def _extract_text_pdf(self):
+        doc = self.loader
+        page_count = len(doc)
+        extract_page = _extract_pdf_page if self.include_fonts else _extract_pdf_page_blocks
+        # Workers open their own copy from the loader's bytes; without them the pages are read here
+        pdf_bytes = self.file_loader.data
+        if page_count < PDF_PARALLEL_MIN_PAGES or pdf_bytes is None:
+            for i, page in enumerate(doc):
+                yield from extract_page(page, i + 1)
+            return
+
+        page_ranges = [
+            range(start, min(start + PDF_PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PDF_PAGES_PER_TASK)
+        ]
+        workers = min(PDF_MAX_WORKERS, os.cpu_count() or 1, len(page_ranges))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_pdf_worker, initargs=(pdf_bytes,)
+        ) as executor:
+            for page_results in executor.map(_extract_pdf_pages, page_ranges, repeat(extract_page)):
+                yield from page_results
+
+    def _extract_text_docx(self):
+        # Bind the per-run lookups to locals once; the loop body then runs on LOAD_FAST only.
+        # Sizes are always numeric (0 when the run sets none), so the heading test is a plain
+        # inline comparison, no helper call or float() coercion.
+        run_text, run_font, run_size, docx_text = _XP_RUN_TEXT, _XP_RUN_FONT, _XP_RUN_SIZE, _docx_text
+        run_bold, run_italic, min_size = _XP_RUN_BOLD, _XP_RUN_ITALIC, HEADING_MIN_FONT_SIZE
+        for run in _XP_DOCX_RUNS(self.loader.element):
+            text = docx_text(run_text(run)).strip()
+            if not text:
+                continue
+            font_name = run_font(run) or "Default"
+            size = run_size(run)
+            font_size = int(size[0]) / 2 if size else 0
+            bold = run_bold(run)
+            yield (1, text, "heading" if bold or font_size > min_size else "text", font_name, font_size, bold, run_italic(run))
+
+    def _extract_text_pptx(self):
+        a_t, a_rpr, a_latin, xsd_true, min_size = _A_T, _A_RPR, _A_LATIN, XSD_TRUE, HEADING_MIN_FONT_SIZE
+        for i, slide in enumerate(self.loader.slides):
+            for run in _XP_PPTX_RUNS(slide.element):
+                t = run.find(a_t)
+                text = t.text.strip() if t is not None and t.text else ""
+                if not text:
+                    continue
+                rpr = run.find(a_rpr)
+                if rpr is None:
+                    font_name, font_size, bold, italic = "Default", 0, False, False
+                else:
+                    latin = rpr.find(a_latin)
+                    font_name = (latin.get("typeface") if latin is not None else None) or "Default"
+                    size = rpr.get("sz")  # hundredths of a point
+                    font_size = int(size) / 100 if size else 0
+                    bold = rpr.get("b") in xsd_true
+                    italic = rpr.get("i") in xsd_true
+                yield (i + 1, text, "heading" if bold or font_size > min_size else "text", font_name, font_size, bold, italic)
+
+    # Link extraction
+    # PDF links and tables read the same fitz document as text and images, so a PDF is parsed once
+    def _extract_links_pdf(self):
+        for i, page in enumerate(self.loader):
+            for link in page.get_links():
+                uri = link.get("uri")
+                if uri:
+                    yield (i + 1, uri)
+
+    def _extract_links_docx(self):
+        # Resolve each w:hyperlink through its relationship id rather than substring-matching
+        # every relationship target against every paragraph's text
+        hyperlink_rels = self._hyperlink_rels
+        for rid in _XP_DOCX_HYPERLINK_RIDS(self.loader.element):
+            target = hyperlink_rels.get(rid)
+            if target:
+                yield (1, target)
+
+    def _extract_links_pptx(self):
+        for slide_num, slide in enumerate(self.loader.slides):
+            for shape in slide.shapes:
+                if shape.has_text_frame:
+                    text_frame = shape.text_frame
+                    for paragraph in text_frame.paragraphs:
+                        for run in paragraph.runs:
+                            if run.hyperlink and run.hyperlink.address:
+                                yield (slide_num + 1, run.hyperlink.address)
+
+    # Image extraction
+    def _extract_images_pdf(self):
+        doc = self.loader
+        # get_images(full=True) reads width, height and filter from each image dictionary, so
+        # nothing is decoded or copied here. The stream is only pulled out when the LazyImage's
+        # bytes are first needed (FileStorage saving it), once per xref however many pages show it,
+        # and on the caller's thread: PyMuPDF is not thread-safe even across Document objects.
+        source = _PDFImageSource(self.file_loader, doc)
+        images = {}
+        for page_num, page in enumerate(doc):
+            for xref, _, width, height, *_, img_filter, _ in page.get_images(full=True):
+                image = images.get(xref)
+                if image is None:
+                    image = images[xref] = LazyImage(
+                        size=(width, height),
+                        img_format=PDF_IMAGE_FORMATS.get(img_filter, "PNG"),
+                        load=partial(source.image_bytes, xref),
+                    )
+                yield (page_num + 1, image.format, image.size, image)
+
+    def _extract_images_docx(self):
+        for i, rel in self._image_rels:
+            img_obj = LazyImage(rel.target_part.blob)
+            yield (i + 1, img_obj.format, img_obj.size, img_obj)
+
+    def _extract_images_pptx(self):
+        for slide_num, slide in enumerate(self.loader.slides):
+            for shape in slide.shapes:
+                if shape.shape_type == 13:  # Picture shape type
+                    img_obj = LazyImage(shape.image.blob)
+                    yield (slide_num + 1, img_obj.format, img_obj.size, img_obj)
+
+    # Table extraction
+    def _extract_tables_pdf(self):
+        for i, page in enumerate(self.loader):
+            for found in page.find_tables():
+                table = found.extract()
+                yield (i + 1, len(table), len(table[0]) if table else 0, table)
+
+    def _extract_tables_docx(self):
+        for i, tbl in enumerate(_XP_DOCX_TABLES(self.loader.element)):
+            yield (i + 1, *_extract_xml_table(tbl, _XP_DOCX_TABLE, _docx_text))
+
+    def _extract_tables_pptx(self):
+        for slide_num, slide in enumerate(self.loader.slides):
+            for shape in slide.shapes:
+                if shape.has_table:
+                    yield (slide_num + 1, *_extract_xml_table(shape.table._tbl, _XP_PPTX_TABLE, _pptx_text))
+
+    # Format -> kind -> implementation. These are the plain functions rather than bound methods,
+    # so an instance holds no reference cycle and is closed by __del__ as soon as it is dropped.
+    HANDLERS = {
+        "pdf": {"text": _extract_text_pdf, "links": _extract_links_pdf, "images": _extract_images_pdf, "tables": _extract_tables_pdf},
+        "docx": {"text": _extract_text_docx, "links": _extract_links_docx, "images": _extract_images_docx, "tables": _extract_tables_docx},
+        "pptx": {"text": _extract_text_pptx, "links": _extract_links_pptx, "images": _extract_images_pptx, "tables": _extract_tables_pptx},
+    }
+
 # Abstract Class: Storage
 class Storage(ABC):
     def __init__(self, extractor):
@@ -250,10 +672,10 @@ class FileStorage(Storage):
                 writer.writerow([f"Page {page_num} ({rows}x{cols})"])
                 writer.writerows(table)
 
-        # Save images
+        # Save images in their embedded format, extension taken from it
         for i, img_format, size, img in self.extractor.extract_images():
-            image_path = os.path.join(output_dir, f"image_{i}.png")
-            img.save(image_path, img_format)
+            image_path = os.path.join(output_dir, f"image_{i}.{img_format.lower()}")
+            img.save(image_path)
 
 
 # Concrete Class: SQLStorage with font metadata support
@@ -272,90 +694,57 @@ class SQLStorage(Storage):
         cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
         conn.close()
 
-    def save_data(self):
-        conn = mysql.connector.connect(host=self.host, user=self.user, password=self.password, database=self.database)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS extracted_data (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                file_name VARCHAR(255),
-                file_size BIGINT,
-                creation_time DATETIME,
-                modification_time DATETIME,
-                page_number INT,
-                data_type VARCHAR(50),
-                content TEXT,
-                font_name VARCHAR(100),
-                font_size VARCHAR(50),
-                bold BOOLEAN,
-                italic BOOLEAN
-            )
-        """)
-
+    # One parameter tuple per extracted_data row: text spans, then links, then tables
+    def _rows(self):
         metadata = self.extractor.metadata
-        file_name = self.extractor.file_name
+        file_info = (self.extractor.file_name, metadata["file_size"], metadata["creation_time"], metadata["modification_time"])
 
         for page_num, text, data_type, font_name, font_size, bold, italic in self.extractor.extract_text():
-            cursor.execute("""
-                INSERT INTO extracted_data (
-                    file_name, file_size, creation_time, modification_time,
-                    page_number, data_type, content, font_name, font_size, bold, italic
-                )
-                VALUES (
-                    %s, %s, FROM_UNIXTIME(%s), FROM_UNIXTIME(%s),
-                    %s, %s, %s, %s, %s, %s, %s
-                )
-            """, (
-                file_name, metadata["file_size"], metadata["creation_time"], metadata["modification_time"],
-                page_num, data_type, text, font_name, font_size, bold, italic
-            ))
+            yield file_info + (page_num, data_type, text, font_name, font_size, bold, italic)
 
         for page_num, url in self.extractor.extract_links():
-            cursor.execute("""
-                INSERT INTO extracted_data (
-                    file_name, file_size, creation_time, modification_time,
-                    page_number, data_type, content, font_name, font_size, bold, italic
-                )
-                VALUES (
-                    %s, %s, FROM_UNIXTIME(%s), FROM_UNIXTIME(%s),
-                    %s, %s, %s, %s, %s, %s, %s
-                )
-            """, (file_name, metadata["file_size"], metadata["creation_time"],
-                  metadata["modification_time"], page_num, "link", url, "", 0, False, False))
+            yield file_info + (page_num, "link", url, "", 0, False, False)
 
         for page_num, rows, cols, table in self.extractor.extract_tables():
-            table_json = json.dumps(table)
-            cursor.execute("""
-                INSERT INTO extracted_data (
-                    file_name, file_size, creation_time, modification_time,
-                    page_number, data_type, content, font_name, font_size, bold, italic
-                )
-                VALUES (
-                    %s, %s, FROM_UNIXTIME(%s), FROM_UNIXTIME(%s),
-                    %s, %s, %s, %s, %s, %s, %s
-                )
-            """, (file_name, metadata["file_size"], metadata["creation_time"],
-                  metadata["modification_time"], page_num, "table", table_json, "", 0, False, False))
+            yield file_info + (page_num, "table", json.dumps(table), "", 0, False, False)
+
+    def save_data(self):
+        # One transaction for the whole document; the connector already prefers its C extension
+        conn = mysql.connector.connect(
+            host=self.host, user=self.user, password=self.password, database=self.database, autocommit=False
+        )
+        conn.cursor().execute(SQL_CREATE_TABLE)
+
+        # Rows stream out of the extractor and go to the server SQL_BATCH_SIZE at a time, each
+        # batch as one extended INSERT with a VALUES group per row. Every full batch passes the
+        # same cached statement, so the prepared cursor prepares it once and only re-sends rows.
+        cursor = conn.cursor(prepared=True)
+        rows = self._rows()
+        while batch := list(islice(rows, SQL_BATCH_SIZE)):
+            cursor.execute(_sql_insert(len(batch)), list(chain.from_iterable(batch)))
 
         conn.commit()
         conn.close()
 
+# Runs one document through both storages; module level so a worker process can unpickle it
+def process_document(file_path, file_type, sql_config):
+    with DataExtractor(get_loader(file_path)) as extractor:
+        FileStorage(extractor).save_data(f"output_{file_type}")
+        SQLStorage(extractor, **sql_config).save_data()
+
 # Example Usage
 def main():
-    pdf_loader = PDFLoader("/home/shtlp_0096/Desktop/coding/assignment_3_dev/media/test1.pdf")
-    doc_loader = DOCXLoader("/home/shtlp_0096/Desktop/coding/assignment_3_dev/media/demo.docx")
-    ppt_loader = PPTLoader("/home/shtlp_0096/Desktop/coding/assignment_3_dev/media/ppt_test.pptx")
-    extractor_ppt = DataExtractor(ppt_loader)
-    extractor_pdf = DataExtractor(pdf_loader)
-    extractor_doc = DataExtractor(doc_loader)
-
-    for extractor, file_type in zip([extractor_pdf, extractor_doc, extractor_ppt], ["pdf", "doc", "ppt"]):
-        file_storage = FileStorage(extractor)
-        file_storage.save_data(f"output_{file_type}")
-
-        sql_storage = SQLStorage(extractor, host="localhost", user="root", password="shills123", database="document_data")
-        sql_storage.save_data()
+    documents = {
+        "pdf": "/home/shtlp_0096/Desktop/coding/assignment_3_dev/media/test1.pdf",
+        "doc": "/home/shtlp_0096/Desktop/coding/assignment_3_dev/media/demo.docx",
+        "ppt": "/home/shtlp_0096/Desktop/coding/assignment_3_dev/media/ppt_test.pptx",
+    }
+    sql_config = {"host": "localhost", "user": "root", "password": "shills123", "database": "document_data"}
+
+    # The documents are independent and each format leans on a different parser, so every one
+    # gets its own process; list() drains the results so a failure in any worker is raised here
+    with ProcessPoolExecutor(max_workers=len(documents)) as executor:
+        list(executor.map(process_document, documents.values(), documents.keys(), repeat(sql_config)))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
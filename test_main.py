@@ -1,13 +1,18 @@
 import os
 import io
 import csv
-import tempfile
-import unittest
-from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock, call, mock_open
+
+import pytest
 from PIL import Image
 
-import pdfplumber
 from docx.document import Document as DocxDocument
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from pptx.oxml import parse_xml as parse_pptx_xml
+from pptx.oxml.ns import nsdecls as pptx_nsdecls
 
 # Import the classes from your main.py
 from main import (
@@ -17,25 +22,84 @@ from main import (
     DataExtractor,
     FileStorage,
     SQLStorage,
+    LazyImage,
+    PDF_PARALLEL_MIN_PAGES,
+    SQL_INSERT,
+    _image_format,
+    _image_size,
+    _is_bold_font,
+    _sql_insert,
+    process_document,
 )
 
+MEDIA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "media")
+FAKE_PDF_BYTES = b"%PDF-1.7 fake"
+# Metadata os.stat reports for the FAKE_PATHS below: 12345 bytes, fixed timestamps
+_FAKE_STAT = os.stat_result((0, 0, 0, 0, 0, 0, 12345, 1600000000, 1600000001, 1600000002))
+
 # ----- Helpers for Fake Objects -----
-# Fake PDF objects for extraction tests
+def encode(size, img_format="PNG", **params):
+    with io.BytesIO() as output:
+        Image.new("RGB", size).save(output, format=img_format, **params)
+        return output.getvalue()
+
+# Image bytes handed out by the fakes, encoded once at import instead of in every test
+_PNG_50, _PNG_70, _PNG_80, _PNG_100 = encode((50, 50)), encode((70, 70)), encode((80, 80)), encode((100, 100))
+_JPEG_60 = encode((60, 60), "JPEG")
+
+# Stands in for an extracted image in the storage tests: FileStorage only asks it to save itself
+class _StubImg:
+    size = (100, 100)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(_PNG_100)
+
+# Fake PDF objects for extraction tests. Page text as get_text("dict") lays it out: a heading
+# span, and a span MuPDF flagged italic (2) and bold (16). Read-only, so pages share it.
+_PDF_TEXT_BLOCKS = (
+    {
+        "type": 0,
+        "lines": (
+            {"spans": ({"text": "Hello PDF", "font": "BoldFont", "size": 14},)},
+            {"spans": ({"text": "Aside", "font": "Serif", "size": 10, "flags": 2 | 16},)},
+        ),
+    },
+)
+
 class FakePDFPage:
-    def __init__(self, blocks):
+    def __init__(self, blocks, links=(), tables=()):
         self._blocks = blocks
+        self._links = list(links)
+        self._tables = list(tables)
 
-    def get_text(self, mode):
+    def get_text(self, mode, flags=None):
         # mode is expected to be "dict"
         return {"blocks": self._blocks}
 
     def get_images(self, full=False):
-        # Return a list with one dummy image reference.
-        return [(10,)]  # tuple with a dummy xref
+        # One image reference, laid out like PyMuPDF's full=True tuples.
+        return [(10, 0, 50, 50, 8, "DeviceRGB", "", "Im10", "FlateDecode", 0)]
+
+    def get_links(self):
+        return self._links
+
+    def find_tables(self):
+        return [SimpleNamespace(extract=lambda table=table: table) for table in self._tables]
 
 class FakePDFDoc:
     def __init__(self, pages):
         self.pages = pages
+        self.is_closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.is_closed = True
 
     def __len__(self):
         return len(self.pages)
@@ -47,443 +111,483 @@ class FakePDFDoc:
         return iter(self.pages)
 
     def extract_image(self, xref):
-        # Create a small dummy image and return its PNG bytes.
-        img = Image.new("RGB", (50, 50), color="blue")
-        with io.BytesIO() as output:
-            img.save(output, format="PNG")
-            return {"image": output.getvalue()}
+        return {"image": _PNG_50, "ext": "png", "width": 50, "height": 50}
+
+# ----- Fixtures -----
+# Paths the extractor tests name without the files existing
+FAKE_PATHS = {"test.pdf", "test.docx", "test.pptx", "notes.txt"}
+
+@pytest.fixture(scope="session", autouse=True)
+def _fixed_stat():
+    # Patched once for the whole run. Only the fake paths get fixed metadata: FileStorage and
+    # the media-file tests need the real os.stat.
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        return _FAKE_STAT if path in FAKE_PATHS else real_stat(path, *args, **kwargs)
+
+    with patch("os.stat", stat):
+        yield
+
+@pytest.fixture
+def fake_pdf_file(monkeypatch):
+    # PDFLoader reads the file's bytes before handing them to (patched) fitz.open.
+    monkeypatch.setattr("main.open", mock_open(read_data=FAKE_PDF_BYTES), raising=False)
+
+@pytest.fixture(scope="module")
+def fake_pdf_doc():
+    # One page carrying the text blocks, two links (one internal) and a table.
+    links = [{"kind": 2, "uri": "http://example.com"}, {"kind": 1, "page": 0}]
+    table = [["cell1", "cell2"], ["cell3", "cell4"]]
+    return FakePDFDoc([FakePDFPage(_PDF_TEXT_BLOCKS, links=links, tables=[table])])
+
+@pytest.fixture(scope="module")
+def fake_docx_doc():
+    # Body: one formatted run, one bold italic run, a run with a tab and line/page breaks, a
+    # w:hyperlink to rId2 and a table with a text box in one cell, a tab and break in another and
+    # a horizontally merged cell in its second row. rId1 is an embedded image.
+    def cell(run_content, props=""):
+        return f"<w:tc>{props}<w:p><w:r>{run_content}</w:r></w:p></w:tc>"
+
+    # Word writes a text box twice, as the drawing and as its VML fallback
+    box = "<w:txbxContent><w:p><w:r><w:t>Box</w:t></w:r></w:p></w:txbxContent>"
+    text_box = (
+        f'<mc:AlternateContent><mc:Choice Requires="wps"><w:drawing>{box}</w:drawing></mc:Choice>'
+        f"<mc:Fallback><w:pict><v:textbox>{box}</v:textbox></w:pict></mc:Fallback></mc:AlternateContent>"
+    )
+
+    merged = '<w:tcPr><w:gridSpan w:val="2"/></w:tcPr>'
+    fake_doc = MagicMock(spec_set=DocxDocument)
+    fake_doc.element = parse_xml(
+        f'<w:document {nsdecls("w", "r")} xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+        ' xmlns:v="urn:schemas-microsoft-com:vml"><w:body>'
+        '<w:p><w:r><w:rPr><w:rFonts w:ascii="Regular"/><w:sz w:val="20"/><w:b w:val="0"/></w:rPr>'
+        '<w:t>Hello DOCX</w:t></w:r><w:r><w:t xml:space="preserve">  </w:t></w:r></w:p>'
+        '<w:p><w:r><w:rPr><w:b/><w:i/></w:rPr><w:t>Title</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t>Name:</w:t><w:tab/><w:t>Value</w:t><w:br/><w:t>Next</w:t><w:br w:type="page"/></w:r></w:p>'
+        '<w:p><w:hyperlink r:id="rId2"><w:r><w:t>example</w:t></w:r></w:hyperlink></w:p>'
+        f'<w:tbl><w:tr>{cell("<w:t>A</w:t>" + text_box)}{cell("<w:t>B</w:t><w:tab/><w:t>1</w:t><w:br/><w:t>2</w:t>")}</w:tr>'
+        f'<w:tr>{cell("<w:t>C</w:t>", merged)}</w:tr></w:tbl>'
+        '</w:body></w:document>'
+    )
+    fake_image_rel = SimpleNamespace(
+        reltype="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image",
+        target_ref="word/media/image1.png",
+        target_part=SimpleNamespace(blob=_PNG_70),
+    )
+    fake_rel = SimpleNamespace(
+        reltype="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink",
+        target_ref="http://example.com",
+    )
+    fake_doc.part = SimpleNamespace(rels={"rId1": fake_image_rel, "rId2": fake_rel})
+    return fake_doc
+
+@pytest.fixture(scope="module")
+def fake_pptx():
+    # One slide: two formatted text shapes and a group whose member is not read in its XML, plus
+    # a hyperlinked run, a picture and a 2x2 table among its shapes.
+    def shape(run_props, text):
+        return (
+            f"<p:sp><p:txBody><a:bodyPr/><a:p><a:r>{run_props}<a:t>{text}</a:t></a:r></a:p></p:txBody></p:sp>"
+        )
+
+    slide_xml = parse_pptx_xml(
+        f'<p:sld {pptx_nsdecls("p", "a")}><p:cSld><p:spTree>'
+        + shape('<a:rPr sz="1000" b="0"><a:latin typeface="Regular"/></a:rPr>', "Hello PPTX")
+        + shape('<a:rPr b="1" i="1"/>', "Bold italic")
+        + "<p:grpSp>" + shape("", "Grouped") + "</p:grpSp>"
+        + "</p:spTree></p:cSld></p:sld>"
+    )
+
+    fake_run = SimpleNamespace(text="Link text", hyperlink=SimpleNamespace(address="http://example.com"))
+    fake_para = SimpleNamespace(runs=[fake_run])
+    link_shape = SimpleNamespace(
+        has_text_frame=True, has_table=False, shape_type=1, text_frame=SimpleNamespace(paragraphs=[fake_para])
+    )
+
+    picture_shape = SimpleNamespace(  # shape_type 13 indicates a picture.
+        has_text_frame=False, has_table=False, shape_type=13, image=SimpleNamespace(blob=_PNG_80)
+    )
+
+    cell = "<a:tc><a:txBody><a:bodyPr/><a:p><a:r><a:t>cell</a:t></a:r></a:p></a:txBody></a:tc>"
+    br_cell = "<a:tc><a:txBody><a:bodyPr/><a:p><a:r><a:t>top</a:t></a:r><a:br/><a:r><a:t>bottom</a:t></a:r></a:p></a:txBody></a:tc>"
+    tbl = parse_pptx_xml(
+        f'<a:tbl {pptx_nsdecls("a")}><a:tr h="0">{cell}{br_cell}</a:tr><a:tr h="0">{cell}{cell}</a:tr></a:tbl>'
+    )
+    table_shape = SimpleNamespace(has_text_frame=False, has_table=True, shape_type=19, table=SimpleNamespace(_tbl=tbl))
+
+    fake_slide = SimpleNamespace(element=slide_xml, shapes=[link_shape, picture_shape, table_shape])
+    return SimpleNamespace(slides=[fake_slide])
+
+@pytest.fixture(scope="module")
+def fake_extractor():
+    # Stands in for a DataExtractor in the storage tests: one text row, link, table and image.
+    return SimpleNamespace(
+        extract_text=lambda: [(1, "Sample text", "text", "Font", 10, False, False)],
+        extract_links=lambda: [(1, "http://sqltest.com")],
+        extract_tables=lambda: [(1, 1, 2, [["cell1", "cell2"]])],
+        extract_images=lambda: [(1, "PNG", (100, 100), _StubImg())],
+        metadata={"file_size": 12345, "creation_time": 1600000000, "modification_time": 1600000001},
+        file_name="dummy_file",
+    )
+
+# Loaders whose load_file hands back an already built fake document
+def make_pdf_loader(doc):
+    loader = PDFLoader("test.pdf")
+    loader.load_file = lambda: doc
+    return loader
+
+def make_docx_loader(doc):
+    loader = DOCXLoader("test.docx")
+    loader.load_file = lambda: doc
+    return loader
+
+def make_ppt_loader(doc):
+    loader = PPTLoader("test.pptx")
+    loader.load_file = lambda: doc
+    return loader
+
+# One DataExtractor per format over the module's fake documents
+@pytest.fixture
+def pdf_extractor(fake_pdf_doc):
+    return DataExtractor(make_pdf_loader(fake_pdf_doc))
+
+@pytest.fixture
+def docx_extractor(fake_docx_doc):
+    return DataExtractor(make_docx_loader(fake_docx_doc))
+
+@pytest.fixture
+def pptx_extractor(fake_pptx):
+    return DataExtractor(make_ppt_loader(fake_pptx))
 
 # ----- Test Cases for File Loaders -----
-class TestFileLoaders(unittest.TestCase):
-    def test_pdfloader_valid(self):
-        loader = PDFLoader("sample.pdf")
-        self.assertEqual(loader.file_path, "sample.pdf")
-    
-    def test_pdfloader_invalid(self):
-        with self.assertRaises(ValueError):
-            PDFLoader("sample.docx")
-    
-    def test_docxloader_valid(self):
-        loader = DOCXLoader("sample.docx")
-        self.assertEqual(loader.file_path, "sample.docx")
-    
-    def test_docxloader_invalid(self):
-        with self.assertRaises(ValueError):
-            DOCXLoader("sample.pdf")
-    
-    def test_pptloader_valid(self):
-        loader = PPTLoader("sample.pptx")
-        self.assertEqual(loader.file_path, "sample.pptx")
-    
-    def test_pptloader_invalid(self):
-        with self.assertRaises(ValueError):
-            PPTLoader("sample.docx")
+LOADER_CASES = [(PDFLoader, "sample.pdf", "sample.docx"), (DOCXLoader, "sample.docx", "sample.pdf"), (PPTLoader, "sample.pptx", "sample.docx")]
+
+@pytest.mark.parametrize("loader_cls, path, bad_path", LOADER_CASES)
+def test_loader_valid(loader_cls, path, bad_path):
+    assert loader_cls(path).file_path == path
+
+@pytest.mark.parametrize("loader_cls, path, bad_path", LOADER_CASES)
+def test_loader_invalid(loader_cls, path, bad_path):
+    with pytest.raises(ValueError):
+        loader_cls(bad_path)
 
 # ----- Test Cases for DataExtractor -----
-class TestDataExtractor(unittest.TestCase):
-    def setUp(self):
-        # Patch os.stat to return fixed metadata.
-        self.fake_stat = os.stat_result((0, 0, 0, 0, 0, 0, 12345, 1600000000, 1600000001, 1600000002))
-        patcher = patch("os.stat", return_value=self.fake_stat)
-        self.addCleanup(patcher.stop)
-        self.mock_stat = patcher.start()
-
-    # A FakePDFLoader subclass to avoid opening real files.
-    class FakePDFLoaderNoOpen(PDFLoader):
-        def load_file(self):
-            # Not used by extract_text or extract_images since we override fitts.open via patch.
-            return None
-
-    @patch("main.fitz.open")
-    def test_extract_text_pdf(self, mock_fitz_open):
-        # Create a fake PDF page with one text block.
-        fake_blocks = [
-            {
-                "type": 0,
-                "lines": [
-                    {"spans": [{"text": "Hello PDF", "font": "BoldFont", "size": 14}]}
-                ]
-            }
-        ]
-        fake_page = FakePDFPage(fake_blocks)
-        fake_doc = FakePDFDoc([fake_page])
-        mock_fitz_open.return_value = fake_doc
-
-        loader = self.FakePDFLoaderNoOpen("test.pdf")
-        extractor = DataExtractor(loader)
-        results = extractor.extract_text()
-        expected = (1, "Hello PDF", "heading", "BoldFont", 14, True, False)
-        self.assertEqual(len(results), 1)
-        self.assertEqual(results[0], expected)
-
-    def test_extract_text_docx(self):
-        # Create a fake DOCX document using MagicMock with spec=DocxDocument.
-        fake_run = MagicMock()
-        fake_run.text = "Hello DOCX"
-        fake_run.font.name = "Regular"
-        fake_run.font.size = MagicMock(pt=10)
-        fake_run.bold = False
-        fake_run.italic = False
-
-        fake_para = MagicMock()
-        fake_para.runs = [fake_run]
-        # Ensure the paragraph text is available.
-        fake_para.text = "Hello DOCX"
-
-        fake_doc = MagicMock(spec=DocxDocument)
-        fake_doc.paragraphs = [fake_para]
-
-        # Create a fake DOCXLoader that returns our fake document.
-        class FakeDOCXLoader(DOCXLoader):
-            def load_file(self):
-                return fake_doc
-
-        loader = FakeDOCXLoader("test.docx")
-        extractor = DataExtractor(loader)
-        results = extractor.extract_text()
-        expected = (1, "Hello DOCX", "text", "Regular", 10, False, False)
-        self.assertEqual(len(results), 1)
-        self.assertEqual(results[0], expected)
-
-    def test_extract_text_pptx(self):
-        # Create a fake PPTX presentation with one slide and one text shape.
-        # Simulate a shape with a text_frame containing one paragraph with one run.
-        from collections import namedtuple
-        FakePPTXRunObj = namedtuple("FakePPTXRunObj", ["text", "font", "hyperlink"])
-        FakeFont = namedtuple("FakeFont", ["name", "size", "bold", "italic"])
-        fake_run = FakePPTXRunObj("Hello PPTX", FakeFont("Regular", type("Size", (), {"pt": 10})(), False, False), None)
-        fake_para = MagicMock()
-        fake_para.runs = [fake_run]
-        fake_text_frame = MagicMock()
-        fake_text_frame.paragraphs = [fake_para]
-        fake_shape = MagicMock()
-        fake_shape.has_text_frame = True
-        fake_shape.text_frame = fake_text_frame
-        fake_slide = MagicMock()
-        fake_slide.shapes = [fake_shape]
-        fake_pptx = MagicMock()
-        fake_pptx.slides = [fake_slide]
-
-        class FakePPTLoader(PPTLoader):
-            def load_file(self):
-                return fake_pptx
-
-        loader = FakePPTLoader("test.pptx")
-        extractor = DataExtractor(loader)
-        results = extractor.extract_text()
-        expected = (1, "Hello PPTX", "text", "Regular", 10, False, False)
-        self.assertEqual(len(results), 1)
-        self.assertEqual(results[0], expected)
-
-    def test_extract_links_pdf(self):
-        # Create a fake pdfplumber PDF object with an annotation.
-        fake_annot = {"uri": "http://example.com"}
-        fake_page = MagicMock()
-        fake_page.annots = [fake_annot]
-        fake_pdf = MagicMock(spec=pdfplumber.PDF)
-        fake_pdf.pages = [fake_page]
-
-        class FakePDFLoaderForLinks(PDFLoader):
-            def load_file(self):
-                return fake_pdf
-
-        loader = FakePDFLoaderForLinks("test.pdf")
-        extractor = DataExtractor(loader)
-        links = extractor.extract_links()
-        self.assertEqual(len(links), 1)
-        self.assertEqual(links[0], (1, "http://example.com"))
-
-    def test_extract_links_docx(self):
-        # Create a fake DOCX document using MagicMock with spec=DocxDocument.
-        fake_para = MagicMock()
-        fake_para.text = "Check this link: http://example.com"
-        fake_doc = MagicMock(spec=DocxDocument)
-        fake_doc.paragraphs = [fake_para]
-        fake_rel = MagicMock()
-        fake_rel.reltype = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
-        fake_rel.target_ref = "http://example.com"
-        fake_doc.part = MagicMock()
-        fake_doc.part.rels = {"rId1": fake_rel}
-
-        class FakeDOCXLoader(DOCXLoader):
-            def load_file(self):
-                return fake_doc
-
-        loader = FakeDOCXLoader("test.docx")
-        extractor = DataExtractor(loader)
-        links = extractor.extract_links()
-        self.assertEqual(len(links), 1)
-        self.assertEqual(links[0], (1, "http://example.com"))
-
-    def test_extract_links_pptx(self):
-        # Create a fake PPTX presentation with a hyperlink in a run.
-        fake_hyperlink = MagicMock()
-        fake_hyperlink.address = "http://example.com"
-        fake_run = MagicMock()
-        fake_run.text = "Link text"
-        fake_run.font.name = "Regular"
-        fake_run.font.size = MagicMock(pt=10)
-        fake_run.font.bold = False
-        fake_run.font.italic = False
-        fake_run.hyperlink = fake_hyperlink
-        fake_para = MagicMock()
-        fake_para.runs = [fake_run]
-        fake_text_frame = MagicMock()
-        fake_text_frame.paragraphs = [fake_para]
-        fake_shape = MagicMock()
-        fake_shape.has_text_frame = True
-        fake_shape.text_frame = fake_text_frame
-        fake_slide = MagicMock()
-        fake_slide.shapes = [fake_shape]
-        fake_pptx = MagicMock()
-        fake_pptx.slides = [fake_slide]
-
-        class FakePPTLoader(PPTLoader):
-            def load_file(self):
-                return fake_pptx
-
-        loader = FakePPTLoader("test.pptx")
-        extractor = DataExtractor(loader)
-        links = extractor.extract_links()
-        self.assertEqual(len(links), 1)
-        self.assertEqual(links[0], (1, "http://example.com"))
-
-    @patch("main.fitz.open")
-    def test_extract_images_pdf(self, mock_fitz_open):
-        # Setup fake PDF pages with images.
-        fake_page = FakePDFPage([])  # No text blocks needed.
-        fake_doc = FakePDFDoc([fake_page])
-        mock_fitz_open.return_value = fake_doc
-
-        # Simulate that the page returns one image.
-        fake_page.get_images = MagicMock(return_value=[(10,)])
-        # Generate PNG bytes for the fake image.
-        fake_img = Image.new("RGB", (60, 60))
-        with io.BytesIO() as output:
-            fake_img.save(output, format="PNG")
-            image_bytes = output.getvalue()
-        fake_doc.extract_image = MagicMock(return_value={"image": image_bytes})
-
-        loader = self.FakePDFLoaderNoOpen("test.pdf")
-        extractor = DataExtractor(loader)
-        images = extractor.extract_images()
-        self.assertEqual(len(images), 1)
-        page_num, img_format, size, img_obj = images[0]
-        self.assertEqual(page_num, 1)
-        self.assertEqual(img_format, "PNG")
-        self.assertEqual(size, (60, 60))
-
-    def test_extract_images_docx(self):
-        # For DOCX, simulate an image relationship.
-        img = Image.new("RGB", (70, 70))
-        with io.BytesIO() as output:
-            img.save(output, format="PNG")
-            image_bytes = output.getvalue()
-        fake_rel = MagicMock()
-        fake_rel.target_ref = "word/media/image1.png"
-        fake_rel.target_part = MagicMock(blob=image_bytes)
-        fake_doc = MagicMock(spec=DocxDocument)
-        fake_doc.part = MagicMock()
-        fake_doc.part.rels = {"rId1": fake_rel}
-        fake_doc.paragraphs = []  # paragraphs not needed for images.
-
-        class FakeDOCXLoader(DOCXLoader):
-            def load_file(self):
-                return fake_doc
-
-        loader = FakeDOCXLoader("test.docx")
-        extractor = DataExtractor(loader)
-        images = extractor.extract_images()
-        self.assertEqual(len(images), 1)
-        page_num, img_format, size, img_obj = images[0]
-        self.assertEqual(page_num, 1)
-        self.assertEqual(img_format, "PNG")
-        self.assertEqual(size, img.size)
-
-    def test_extract_images_pptx(self):
-        # For PPTX, simulate a slide with a picture shape.
-        img = Image.new("RGB", (80, 80))
-        with io.BytesIO() as output:
-            img.save(output, format="PNG")
-            image_bytes = output.getvalue()
-
-        fake_shape = MagicMock()
-        fake_shape.shape_type = 13  # Indicates a picture.
-        fake_image = MagicMock()
-        fake_image.blob = image_bytes
-        fake_shape.image = fake_image
-        fake_slide = MagicMock()
-        fake_slide.shapes = [fake_shape]
-        fake_pptx = MagicMock()
-        fake_pptx.slides = [fake_slide]
-
-        class FakePPTLoader(PPTLoader):
-            def load_file(self):
-                return fake_pptx
-
-        loader = FakePPTLoader("test.pptx")
-        extractor = DataExtractor(loader)
-        images = extractor.extract_images()
-        self.assertEqual(len(images), 1)
-        page_num, img_format, size, img_obj = images[0]
-        self.assertEqual(page_num, 1)
-        self.assertEqual(img_format, "PNG")
-        self.assertEqual(size, img.size)
-
-    def test_extract_tables_pdf(self):
-        # For PDF, simulate a page that returns tables.
-        fake_table = [["cell1", "cell2"], ["cell3", "cell4"]]
-        fake_page = MagicMock()
-        fake_page.extract_tables = MagicMock(return_value=[fake_table])
-        fake_pdf = MagicMock(spec=pdfplumber.PDF)
-        fake_pdf.pages = [fake_page]
-
-        class FakePDFLoaderForTables(PDFLoader):
-            def load_file(self):
-                return fake_pdf
-
-        loader = FakePDFLoaderForTables("test.pdf")
-        extractor = DataExtractor(loader)
-        tables = extractor.extract_tables()
-        self.assertEqual(len(tables), 1)
-        page_num, num_rows, num_cols, table = tables[0]
-        self.assertEqual(page_num, 1)
-        self.assertEqual(num_rows, 2)
-        self.assertEqual(num_cols, 2)
-        self.assertEqual(table, fake_table)
-
-    def test_extract_tables_docx(self):
-        # For DOCX, simulate a document with one table using a MagicMock.
-        # Create fake cell objects.
-        fake_cell1 = MagicMock()
-        fake_cell1.text = "A"
-        fake_cell2 = MagicMock()
-        fake_cell2.text = "B"
-        fake_row1 = MagicMock()
-        fake_row1.cells = [fake_cell1, fake_cell2]
-        fake_cell3 = MagicMock()
-        fake_cell3.text = "C"
-        fake_cell4 = MagicMock()
-        fake_cell4.text = "D"
-        fake_row2 = MagicMock()
-        fake_row2.cells = [fake_cell3, fake_cell4]
-        fake_table = MagicMock()
-        fake_table.rows = [fake_row1, fake_row2]
-
-        fake_doc = MagicMock(spec=DocxDocument)
-        fake_doc.tables = [fake_table]
-        fake_doc.paragraphs = []  # paragraphs not needed.
-
-        class FakeDOCXLoader(DOCXLoader):
-            def load_file(self):
-                return fake_doc
-
-        loader = FakeDOCXLoader("test.docx")
-        extractor = DataExtractor(loader)
-        tables = extractor.extract_tables()
-        self.assertEqual(len(tables), 1)
-        page_num, num_rows, num_cols, table = tables[0]
-        self.assertEqual(num_rows, 2)
-        self.assertEqual(num_cols, 2)
-        self.assertEqual(table, [["A", "B"], ["C", "D"]])
-
-    def test_extract_tables_pptx(self):
-        # For PPTX, simulate a slide with a shape that has a table.
-        fake_shape = MagicMock()
-        fake_shape.has_table = True
-        # Create a fake table with 2 rows and 2 cells each.
-        FakeCell = lambda t: type("FakeCell", (), {"text": t})()
-        FakeRow = lambda cells: type("FakeRow", (), {"cells": cells})()
-        fake_table_obj = type("FakeTable", (), {"rows": [FakeRow([FakeCell("cell"), FakeCell("cell")]),
-                                                         FakeRow([FakeCell("cell"), FakeCell("cell")])]})
-        fake_shape.table = fake_table_obj
-        fake_slide = MagicMock()
-        fake_slide.shapes = [fake_shape]
-        fake_pptx = MagicMock()
-        fake_pptx.slides = [fake_slide]
-
-        class FakePPTLoader(PPTLoader):
-            def load_file(self):
-                return fake_pptx
-
-        loader = FakePPTLoader("test.pptx")
-        extractor = DataExtractor(loader)
-        tables = extractor.extract_tables()
-        self.assertEqual(len(tables), 1)
-        page_num, num_rows, num_cols, table = tables[0]
-        self.assertEqual(num_rows, 2)
-        self.assertEqual(num_cols, 2)
+def test_extract_text_pdf(pdf_extractor):
+    # Bold comes from the font name only; MuPDF's span flags are not read
+    assert list(pdf_extractor.extract_text()) == [
+        (1, "Hello PDF", "heading", "BoldFont", 14, True, False),
+        (1, "Aside", "text", "Serif", 10, False, False),
+    ]
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_extract_text_pdf_without_fonts(mock_fitz):
+    # Plain-text mode reads MuPDF "blocks" tuples; image blocks (type 1) are skipped.
+    fake_page = MagicMock()
+    fake_page.get_text.return_value = [(0, 0, 1, 1, " Plain block\n", 0, 0), (0, 0, 1, 1, "<image>", 1, 1)]
+    mock_fitz.return_value = FakePDFDoc([fake_page])
+
+    extractor = DataExtractor(PDFLoader("test.pdf"), include_fonts=False)
+    results = list(extractor.extract_text())
+    assert results == [(1, "Plain block", "text", "Default", 0, False, False)]
+    assert fake_page.get_text.call_args[0][0] == "blocks"
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_extract_text_pdf_parallel(monkeypatch, mock_fitz):
+    # Enough pages to take the worker-pool path; threads stand in for processes so the patch applies.
+    pages = [
+        FakePDFPage([{"type": 0, "lines": [{"spans": [{"text": f"Page {n}", "font": "Regular", "size": 10}]}]}])
+        for n in range(1, PDF_PARALLEL_MIN_PAGES + 3)
+    ]
+    mock_fitz.return_value = FakePDFDoc(pages)
+    monkeypatch.setattr("main.ProcessPoolExecutor", ThreadPoolExecutor)
+
+    results = list(DataExtractor(PDFLoader("test.pdf")).extract_text())
+    assert [r[0] for r in results] == list(range(1, len(pages) + 1))
+    assert results[-1] == (len(pages), f"Page {len(pages)}", "text", "Regular", 10, False, False)
+    # Workers open their document from the bytes the loader already read, never from the path
+    assert all(c == call(stream=FAKE_PDF_BYTES, filetype="pdf") for c in mock_fitz.call_args_list)
+
+def test_extract_text_pdf_sequential_without_loader_bytes(monkeypatch):
+    # A loader that hands over an open document but no file bytes gets the pages read in-process
+    pages = [
+        FakePDFPage([{"type": 0, "lines": [{"spans": [{"text": f"Page {n}", "font": "Regular", "size": 10}]}]}])
+        for n in range(1, PDF_PARALLEL_MIN_PAGES + 3)
+    ]
+    monkeypatch.setattr("main.ProcessPoolExecutor", MagicMock(side_effect=AssertionError("page pool used")))
+
+    results = list(DataExtractor(make_pdf_loader(FakePDFDoc(pages))).extract_text())
+    assert [r[1] for r in results] == [f"Page {n}" for n in range(1, len(pages) + 1)]
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_pdf_opened_once_for_all_passes(mock_fitz):
+    mock_fitz.return_value = FakePDFDoc([FakePDFPage([])])
+    extractor = DataExtractor(PDFLoader("test.pdf"))
+    list(extractor.extract_text())
+    list(extractor.extract_images())
+    list(extractor.extract_links())
+    list(extractor.extract_tables())
+    mock_fitz.assert_called_once_with(stream=FAKE_PDF_BYTES, filetype="pdf")
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_extract_results_cached(mock_fitz):
+    page = FakePDFPage(_PDF_TEXT_BLOCKS)
+    page.get_text = MagicMock(wraps=page.get_text)
+    mock_fitz.return_value = FakePDFDoc([page])
+
+    extractor = DataExtractor(PDFLoader("test.pdf"))
+    # Nothing is parsed until the first pass is iterated, and a pass abandoned early is not cached
+    rows = extractor.extract_text()
+    page.get_text.assert_not_called()
+    next(rows)
+    page.get_text.reset_mock()
+    first = list(extractor.extract_text())
+    second = list(extractor.extract_text())
+    assert first == second
+    page.get_text.assert_called_once()
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_pdf_closed_on_exit(mock_fitz):
+    fake_doc = FakePDFDoc([FakePDFPage([])])
+    mock_fitz.return_value = fake_doc
+
+    with DataExtractor(PDFLoader("test.pdf")) as extractor:
+        list(extractor.extract_text())
+        assert not fake_doc.is_closed
+    assert fake_doc.is_closed
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_pdf_closed_when_extractor_dropped(mock_fitz):
+    fake_doc = FakePDFDoc([FakePDFPage([])])
+    mock_fitz.return_value = fake_doc
+
+    extractor = DataExtractor(PDFLoader("test.pdf"))
+    list(extractor.extract_text())
+    del extractor
+    assert fake_doc.is_closed
+
+@pytest.mark.parametrize("font_name", ["Arial-BoldMT", "Roboto-Black", "Lato-Heavy", "semibold"])
+def test_is_bold_font(font_name):
+    assert _is_bold_font(font_name)
+
+def test_is_bold_font_regular():
+    assert not _is_bold_font("Helvetica")
+
+def test_metadata_from_stat(docx_extractor):
+    assert docx_extractor.metadata == {
+        "file_size": _FAKE_STAT.st_size,
+        "creation_time": _FAKE_STAT.st_ctime,
+        "modification_time": _FAKE_STAT.st_mtime,
+    }
+
+def test_unsupported_format():
+    fake_loader = SimpleNamespace(file_path="notes.txt")
+    with pytest.raises(ValueError):
+        DataExtractor(fake_loader)
+
+def test_extract_many(monkeypatch):
+    monkeypatch.setattr("main.ProcessPoolExecutor", ThreadPoolExecutor)
+    paths = [os.path.join(MEDIA_DIR, name) for name in ("demo.docx", "ppt_test.pptx")]
+    results = list(DataExtractor.extract_many(paths, workers=2))
+    assert [r["file_name"] for r in results] == ["demo.docx", "ppt_test.pptx"]
+    assert results[1]["text"][0][:3] == (1, "Sample PowerPoint File", "heading")
+    assert (1, "http://calibre-ebook.com/download") in results[0]["links"]
+
+def test_extract_text_docx(docx_extractor):
+    # Only direct body runs count as text; the whitespace-only run is dropped.
+    assert list(docx_extractor.extract_text()) == [
+        (1, "Hello DOCX", "text", "Regular", 10, False, False),
+        (1, "Title", "heading", "Default", 0, True, True),
+        # Tabs and text-wrapping breaks read as python-docx's Run.text has them; a page break adds nothing
+        (1, "Name:\tValue\nNext", "text", "Default", 0, False, False),
+    ]
+
+def test_extract_text_pptx(pptx_extractor):
+    assert list(pptx_extractor.extract_text()) == [
+        (1, "Hello PPTX", "text", "Regular", 10, False, False),
+        (1, "Bold italic", "heading", "Default", 0, True, True),
+    ]
+
+@pytest.mark.parametrize("extractor_fx", ["pdf_extractor", "docx_extractor", "pptx_extractor"])
+def test_extract_links(extractor_fx, request):
+    # The PDF's internal (page jump) link and the DOCX image relationship are not link targets.
+    links = list(request.getfixturevalue(extractor_fx).extract_links())
+    assert links == [(1, "http://example.com")]
+
+@pytest.mark.parametrize("extractor_fx, expected", [
+    ("pdf_extractor", [(1, "PNG", (50, 50), _PNG_50)]),
+    ("docx_extractor", [(1, "PNG", (70, 70), _PNG_70)]),
+    ("pptx_extractor", [(1, "PNG", (80, 80), _PNG_80)]),
+])
+def test_extract_images(extractor_fx, expected, request):
+    # Sizes are read from the image headers and the embedded bytes come back untouched
+    images = request.getfixturevalue(extractor_fx).extract_images()
+    assert [(page_num, img_format, size, img_obj.blob) for page_num, img_format, size, img_obj in images] == expected
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_extract_images_pdf_jpeg(mock_fitz):
+    # Setup fake PDF pages with images.
+    fake_page = FakePDFPage([])  # No text blocks needed.
+    fake_doc = FakePDFDoc([fake_page])
+    mock_fitz.return_value = fake_doc
+
+    # Simulate that the page returns one JPEG image.
+    fake_page.get_images = lambda full=False: [(10, 0, 60, 60, 8, "DeviceRGB", "", "Im10", "DCTDecode", 0)]
+    fake_doc.extract_image = MagicMock(return_value={"image": _JPEG_60, "ext": "jpeg", "width": 60, "height": 60})
+
+    [(page_num, img_format, size, img_obj)] = DataExtractor(PDFLoader("test.pdf")).extract_images()
+    assert (page_num, img_format, size) == (1, "JPEG", (60, 60))
+    # Size and format come from the image dictionary; the stream is only read on demand.
+    fake_doc.extract_image.assert_not_called()
+    assert img_obj.blob == _JPEG_60
+    fake_doc.extract_image.assert_called_once_with(10)
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_extract_images_pdf_shared_xref(mock_fitz):
+    # The same image referenced from three pages is only extracted once.
+    fake_doc = FakePDFDoc([FakePDFPage([]) for _ in range(3)])
+    fake_doc.extract_image = MagicMock(wraps=fake_doc.extract_image)
+    mock_fitz.return_value = fake_doc
+
+    images = list(DataExtractor(PDFLoader("test.pdf")).extract_images())
+    assert [img[0] for img in images] == [1, 2, 3]
+    assert {img[2] for img in images} == {(50, 50)}
+    for img in images:
+        img[3].blob
+    fake_doc.extract_image.assert_called_once_with(10)
+
+@pytest.mark.parametrize("extractor_fx, expected", [
+    ("pdf_extractor", [(1, 2, 2, [["cell1", "cell2"], ["cell3", "cell4"]])]),
+    # The merged cell's text repeats across the columns it spans. Cells read as cell.text does:
+    # no text box content, w:tab/w:br as tab/newline, a PPTX a:br as a vertical tab
+    ("docx_extractor", [(1, 2, 2, [["A", "B\t1\n2"], ["C", "C"]])]),
+    ("pptx_extractor", [(1, 2, 2, [["cell", "top\vbottom"], ["cell", "cell"]])]),
+])
+def test_extract_tables(extractor_fx, expected, request):
+    assert list(request.getfixturevalue(extractor_fx).extract_tables()) == expected
+
+# ----- Test Cases for Image Helpers -----
+@pytest.mark.parametrize("img_format", ["PNG", "JPEG", "GIF", "BMP"])
+def test_image_size_from_headers(img_format):
+    assert tuple(_image_size(encode((30, 20), img_format))) == (30, 20)
+
+def test_image_size_skips_pil_for_progressive_jpeg():
+    blob = encode((30, 20), "JPEG", progressive=True)
+    with patch("main.Image.open", side_effect=AssertionError("PIL fallback used")):
+        assert tuple(_image_size(blob)) == (30, 20)
+
+@pytest.mark.parametrize("img_format", ["PNG", "JPEG", "GIF", "BMP", "TIFF", "WEBP"])
+def test_image_format_from_headers(img_format):
+    assert _image_format(encode((4, 4), img_format)) == img_format
+
+def test_lazy_image_decodes_on_demand():
+    lazy = LazyImage(encode((40, 10)))
+    assert tuple(lazy.size) == (40, 10)
+    assert lazy.format == "PNG"
+    with lazy.open() as img:
+        assert img.size == (40, 10)
+
+def test_lazy_image_saves_embedded_bytes(tmp_path):
+    LazyImage(_JPEG_60).save(tmp_path / "image.jpeg")
+    assert (tmp_path / "image.jpeg").read_bytes() == _JPEG_60
 
 # ----- Test Cases for Storage Classes -----
-class TestFileStorage(unittest.TestCase):
-    def setUp(self):
-        self.fake_extractor = MagicMock()
-        self.fake_extractor.extract_text.return_value = [
-            (1, "Sample text", "text", "Font", 10, False, False)
-        ]
-        self.fake_extractor.extract_tables.return_value = [
-            (1, 1, 2, [["cell1", "cell2"]])
-        ]
-        img = Image.new("RGB", (100, 100))
-        self.fake_extractor.extract_images.return_value = [
-            (1, "PNG", img.size, img)
-        ]
-        self.fake_extractor.metadata = {"file_size": 12345, "creation_time": 1600000000, "modification_time": 1600000001}
-        self.fake_extractor.file_name = "dummy_file"
-
-    def test_file_storage_save_data(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            storage = FileStorage(self.fake_extractor)
-            storage.save_data(tmpdir)
-            text_file = os.path.join(tmpdir, "text_data.txt")
-            self.assertTrue(os.path.exists(text_file))
-            with open(text_file, "r", encoding="utf-8") as f:
-                content = f.read()
-                self.assertIn("Sample text", content)
-            tables_file = os.path.join(tmpdir, "tables.csv")
-            self.assertTrue(os.path.exists(tables_file))
-            with open(tables_file, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                rows = list(reader)
-                self.assertTrue(any("cell1" in cell for row in rows for cell in row))
-            image_path = os.path.join(tmpdir, "image_1.png")
-            self.assertTrue(os.path.exists(image_path))
-
-class TestSQLStorage(unittest.TestCase):
-    def setUp(self):
-        self.fake_extractor = MagicMock()
-        self.fake_extractor.extract_text.return_value = [
-            (1, "SQL text", "text", "Font", 12, True, False)
-        ]
-        self.fake_extractor.extract_links.return_value = [
-            (1, "http://sqltest.com")
-        ]
-        self.fake_extractor.extract_tables.return_value = [
-            (1, 2, 2, [["A", "B"], ["C", "D"]])
-        ]
-        self.fake_extractor.metadata = {"file_size": 54321, "creation_time": 1600100000, "modification_time": 1600100001}
-        self.fake_extractor.file_name = "sql_dummy_file"
-
-    @patch("main.mysql.connector.connect")
-    def test_sql_storage_save_data(self, mock_connect):
-        fake_cursor = MagicMock()
-        fake_conn = MagicMock()
-        fake_conn.cursor.return_value = fake_cursor
-        mock_connect.return_value = fake_conn
-
-        storage = SQLStorage(self.fake_extractor, host="localhost", user="root", password="pass", database="test_db")
-        storage.save_data()
-
-        create_db_call = call("CREATE DATABASE IF NOT EXISTS test_db")
-        self.assertIn(create_db_call, fake_cursor.execute.call_args_list)
-
-        insert_calls = [args for args in fake_cursor.execute.call_args_list if "INSERT INTO extracted_data" in args[0][0]]
-        self.assertEqual(len(insert_calls), 3)
-
-        fake_conn.commit.assert_called_once()
-        # Expect two calls to close: one from _ensure_database_exists and one from save_data.
-        self.assertEqual(fake_conn.close.call_count, 2)
-
-# ----- Run all tests -----
-if __name__ == "__main__":
-    unittest.main()
+def test_file_storage_save_data(fake_extractor, tmp_path):
+    output_dir = tmp_path / "out"
+    FileStorage(fake_extractor).save_data(output_dir)
+    assert "Sample text" in (output_dir / "text_data.txt").read_text(encoding="utf-8")
+    with open(output_dir / "tables.csv", "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+        assert any("cell1" in cell for row in rows for cell in row)
+    # Each image saves itself to a file named after its format
+    assert (output_dir / "image_1.png").read_bytes() == _PNG_100
+
+def test_sql_storage_save_data(fake_extractor, mysql_connect):
+    mock_connect, fake_conn, fake_cursor = mysql_connect
+    storage = SQLStorage(fake_extractor, host="localhost", user="root", password="pass", database="test_db")
+    storage.save_data()
+
+    calls = fake_cursor.execute.call_args_list
+    assert call("CREATE DATABASE IF NOT EXISTS test_db") in calls
+
+    # All three rows (text, link, table) go out in one multi-row INSERT, 11 parameters per row.
+    [(sql, params)] = [c.args for c in calls if c.args[0].startswith(SQL_INSERT)]
+    assert sql.count("FROM_UNIXTIME(%s), FROM_UNIXTIME(%s)") == 3
+    assert params[5::11] == ["text", "link", "table"]
+    fake_cursor.executemany.assert_not_called()
+
+    fake_conn.commit.assert_called_once()
+    assert mock_connect.call_args.kwargs["autocommit"] is False
+    # Expect two calls to close: one from _ensure_database_exists and one from save_data.
+    assert fake_conn.close.call_count == 2
+
+def test_sql_storage_batches_rows(monkeypatch, fake_extractor, mysql_connect):
+    mock_connect, fake_conn, fake_cursor = mysql_connect
+    monkeypatch.setattr("main.SQL_BATCH_SIZE", 2)
+
+    SQLStorage(fake_extractor, host="localhost", user="root", password="pass", database="test_db").save_data()
+
+    batches = [c.args[1] for c in fake_cursor.execute.call_args_list if c.args[0].startswith(SQL_INSERT)]
+    assert [len(batch) // 11 for batch in batches] == [2, 1]
+    fake_conn.cursor.assert_any_call(prepared=True)
+    # Full batches hand the prepared cursor the very same statement object
+    assert _sql_insert(2) is _sql_insert(2)
+
+# ----- Test Cases for the pipeline -----
+def test_process_document_runs_both_storages(monkeypatch):
+    mock_file_storage = MagicMock()
+    mock_sql_storage = MagicMock()
+    monkeypatch.setattr("main.FileStorage", mock_file_storage)
+    monkeypatch.setattr("main.SQLStorage", mock_sql_storage)
+    sql_config = {"host": "localhost", "user": "root", "password": "pass", "database": "test_db"}
+    process_document(os.path.join(MEDIA_DIR, "demo.docx"), "doc", sql_config)
+
+    extractor = mock_file_storage.call_args[0][0]
+    assert isinstance(extractor, DataExtractor)
+    mock_file_storage.return_value.save_data.assert_called_once_with("output_doc")
+    mock_sql_storage.assert_called_once_with(extractor, **sql_config)
+    mock_sql_storage.return_value.save_data.assert_called_once()
+
+def test_extract_many_pdf_images_survive_close():
+    # PDF image bytes are fetched lazily, so the worker must pull them in before its document closes.
+    [result] = DataExtractor.extract_many([os.path.join(MEDIA_DIR, "test1.pdf")], workers=1)
+    page_num, img_format, size, img = result["images"][0]
+    assert (page_num, img_format, size) == (2, "PNG", (961, 449))
+    with img.open() as decoded:
+        assert decoded.size == size
+
+def test_pdf_images_saved_after_extractor_closed(tmp_path):
+    # Cached images fetch their bytes as the document closes, so storages can still save them afterwards
+    with DataExtractor(PDFLoader(os.path.join(MEDIA_DIR, "test1.pdf"))) as extractor:
+        [(page_num, img_format, size, img)] = extractor.extract_images()
+    FileStorage(extractor).save_data(tmp_path)
+    assert (tmp_path / "image_2.png").read_bytes() == img.blob
+
+def test_pdf_images_outlive_extractor(tmp_path):
+    extractor = DataExtractor(PDFLoader(os.path.join(MEDIA_DIR, "test1.pdf")))
+    [(page_num, img_format, size, img)] = extractor.extract_images()
+    del extractor
+    img.save(tmp_path / "image.png")
+    with Image.open(tmp_path / "image.png") as saved:
+        assert saved.size == size
+
+def test_pdf_image_from_abandoned_pass_read_after_close():
+    # An image handed out by a pass that never finished still reads after its document is closed
+    extractor = DataExtractor(PDFLoader(os.path.join(MEDIA_DIR, "test1.pdf")))
+    page_num, img_format, size, img = next(extractor.extract_images())
+    extractor.close()
+    with img.open() as decoded:
+        assert decoded.size == size
+
+@pytest.mark.usefixtures("fake_pdf_file")
+def test_dropping_extractor_leaves_pdf_images_unread(mock_fitz):
+    # Closing reads nothing; an image's bytes are only extracted when something asks for them
+    fake_doc = FakePDFDoc([FakePDFPage([])])
+    fake_doc.extract_image = MagicMock(wraps=fake_doc.extract_image)
+    mock_fitz.return_value = fake_doc
+
+    extractor = DataExtractor(PDFLoader("test.pdf"))
+    images = list(extractor.extract_images())
+    del extractor
+    assert fake_doc.is_closed
+    fake_doc.extract_image.assert_not_called()